@@ -1,10 +1,22 @@
 import asyncio
+import multiprocessing
+from collections import deque
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
+from aiohttp import TCPConnector
 from arangoasync import ArangoClient
-from arangoasync.typings import CollectionType
+from arangoasync.http import AioHTTPClient
+from arangoasync.typings import CollectionType, Json, Jsons
 from arangoasync.auth import Auth
-import pandas as pd
+from arangoasync.collection import StandardCollection
+from arangoasync.exceptions import DeserializationError, SerializationError
+from arangoasync.serialization import Deserializer, Serializer
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv
 
 DATA_PATH = Path(__file__).parent.parent.parent / "tpch-osx" / "dbgen"
 
@@ -21,22 +33,172 @@ INDICES = {
     "region": [("r_regionkey", True)],
 }
 
+# Column names of every TPC-H table, in file order
+SCHEMAS: dict[str, list[str]] = {
+    "region": ["r_regionkey", "r_name", "r_comment"],
+    "nation": ["n_nationkey", "n_name", "n_regionkey", "n_comment"],
+    "supplier": ["s_suppkey", "s_name", "s_address", "s_nationkey", "s_phone", "s_acctbal", "s_comment"],
+    "customer": [
+        "c_custkey", "c_name", "c_address", "c_nationkey", "c_phone", "c_acctbal", "c_mktsegment",
+        "c_comment",
+    ],
+    "part": [
+        "p_partkey", "p_name", "p_mfgr", "p_brand", "p_type", "p_size", "p_container", "p_retailprice",
+        "p_comment",
+    ],
+    "partsupp": ["ps_partkey", "ps_suppkey", "ps_availqty", "ps_supplycost", "ps_comment"],
+    "orders": [
+        "o_orderkey", "o_custkey", "o_orderstatus", "o_totalprice", "o_orderdate", "o_orderpriority",
+        "o_clerk", "o_shippriority", "o_comment",
+    ],
+    "lineitem": [
+        "l_orderkey", "l_partkey", "l_suppkey", "l_linenumber", "l_quantity", "l_extendedprice",
+        "l_discount", "l_tax", "l_returnflag", "l_linestatus", "l_shipdate", "l_commitdate", "l_receiptdate",
+        "l_shipinstruct", "l_shipmode", "l_comment",
+    ],
+}
+
+# Numeric TPC-H columns, every other column (including dates) is read as a string
+COLUMN_TYPES = {
+    "r_regionkey": pa.int64(),
+    "n_nationkey": pa.int64(), "n_regionkey": pa.int64(),
+    "s_suppkey": pa.int64(), "s_nationkey": pa.int64(), "s_acctbal": pa.float64(),
+    "c_custkey": pa.int64(), "c_nationkey": pa.int64(), "c_acctbal": pa.float64(),
+    "p_partkey": pa.int64(), "p_size": pa.int64(), "p_retailprice": pa.float64(),
+    "ps_partkey": pa.int64(), "ps_suppkey": pa.int64(), "ps_availqty": pa.int64(), "ps_supplycost": pa.float64(),
+    "o_orderkey": pa.int64(), "o_custkey": pa.int64(), "o_totalprice": pa.float64(), "o_shippriority": pa.int64(),
+    "l_orderkey": pa.int64(), "l_partkey": pa.int64(), "l_suppkey": pa.int64(), "l_linenumber": pa.int64(),
+    "l_quantity": pa.int64(), "l_extendedprice": pa.float64(), "l_discount": pa.float64(), "l_tax": pa.float64(),
+}
+
+# Lineitem rows per bulk import, capped so a single request stays a manageable transaction
+DEFAULT_BATCH_SIZE = 5000
+MAX_BATCH_SIZE = 50000
+# Lineitem batches being turned into payloads by worker processes at once
+MAX_BUILDS_IN_FLIGHT = 4
+
+
+def tbl_options(columns: list[str]) -> dict[str, Any]:
+    """pyarrow.csv options for a pipe-delimited TPC-H .tbl file, dropping the trailing empty column"""
+    column_types = {column: COLUMN_TYPES.get(column, pa.string()) for column in columns}
+    return {
+        "read_options": csv.ReadOptions(column_names=columns + ["_trailing"], block_size=64 << 20),
+        "parse_options": csv.ParseOptions(delimiter="|"),
+        "convert_options": csv.ConvertOptions(include_columns=columns, column_types=column_types),
+    }
+
+
+def read_tbl(path: Path, columns: list[str]) -> pa.Table:
+    """Read a whole TPC-H .tbl file into memory"""
+    return csv.read_csv(path, **tbl_options(columns))
+
+
+def stream_tbl(path: Path, columns: list[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[pa.Table]:
+    """Stream a TPC-H .tbl file block by block, yielding tables of at most batch_size rows"""
+    for record_batch in csv.open_csv(path, **tbl_options(columns)):
+        for start in range(0, record_batch.num_rows, batch_size):
+            yield pa.Table.from_batches([record_batch.slice(start, batch_size)])
+
+
+def key_column(*columns: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Build ArangoDB _key strings from key columns, joining composite keys with '_'"""
+    return pc.binary_join_element_wise(*(pc.cast(column, pa.string()) for column in columns), "_")
+
+
+def id_column(collection: str, keys: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Prefix _key strings with a collection name to build _from/_to document handles"""
+    return pc.binary_join_element_wise(f"{collection}/", keys, "")
+
+
+def to_ndjson(table: pa.Table) -> bytes:
+    """Serialize an Arrow table as newline-delimited JSON for ArangoDB's import API"""
+    return b"\n".join(map(orjson.dumps, table.to_pylist()))
+
+
+def build_lineitem_payloads(batch: pa.Table) -> tuple[bytes, bytes, bytes, bytes]:
+    """Build the lineitem documents and order/part/supplier edges of one batch as NDJSON.
+
+    Module-level so it can run in a worker process.
+    """
+    # Each key column is cast to strings once and shared by the _key and _from/_to columns
+    order_keys = key_column(batch["l_orderkey"])
+    lineitem_keys = key_column(order_keys, batch["l_linenumber"])
+    lineitem_ids = id_column("lineitem", lineitem_keys)
+    lineitem_data = to_ndjson(batch.add_column(0, "_key", lineitem_keys))
+    order_edges = to_ndjson(pa.table({
+        "_from": id_column("orders", order_keys),
+        "_to": lineitem_ids,
+        "l_orderkey": batch["l_orderkey"],
+    }))
+    part_edges = to_ndjson(pa.table({
+        "_from": lineitem_ids,
+        "_to": id_column("part", key_column(batch["l_partkey"])),
+        "l_partkey": batch["l_partkey"],
+    }))
+    supplier_edges = to_ndjson(pa.table({
+        "_from": lineitem_ids,
+        "_to": id_column("supplier", key_column(batch["l_suppkey"])),
+        "l_suppkey": batch["l_suppkey"],
+    }))
+    return lineitem_data, order_edges, part_edges, supplier_edges
+
+
+class OrjsonSerializer(Serializer[Json]):
+    """Driver JSON serializer backed by orjson"""
+
+    def dumps(self, data: Json | Sequence[str | Json]) -> str:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NAIVE_UTC).decode()
+        except Exception as e:
+            # The driver only handles its own error types, e.g. when refreshing tokens
+            raise SerializationError("Failed to serialize data to JSON.") from e
+
+
+class OrjsonDeserializer(Deserializer[Json, Jsons]):
+    """Driver JSON deserializer backed by orjson"""
+
+    def loads(self, data: bytes) -> Json:
+        try:
+            return orjson.loads(data)
+        except Exception as e:
+            # Lets the driver report the HTTP error when a failed response has a non-JSON body
+            raise DeserializationError("Failed to deserialize data from JSON.") from e
+
+    def loads_many(self, data: bytes) -> Jsons:
+        return self.loads(data)
+
 
 class ArangoTPCH:
-    def __init__(self, config: dict[str, Any] | None = None) -> None:
+    def __init__(self, config: dict[str, Any] | None = None, batch_size: int | None = None) -> None:
         self.config = config or {
             "host": "http://localhost:8529",
             "username": "root",
             "password": "password",
             "database": "tpch",
             "graph": "tpchgraph",
+            "batch_size": DEFAULT_BATCH_SIZE,
+            "connection_limit": 64,
         }
+        if batch_size is not None:
+            self.config = {**self.config, "batch_size": batch_size}
+        if not 1 <= self.config.get("batch_size", DEFAULT_BATCH_SIZE) <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}, got {self.config['batch_size']}")
         self.client = None
         self.db = None
+        # Collection handles resolved once in asetup_collections and reused by every loader
+        self.collections: dict[str, StandardCollection] = {}
 
 
     async def aconnect(self) -> None:
-        self.client = ArangoClient(hosts=self.config["host"])
+        # One shared keep-alive pool, large enough for the concurrent imports issued by aload
+        connection_limit = self.config.get("connection_limit", 64)
+        connector = TCPConnector(limit=connection_limit, limit_per_host=connection_limit, keepalive_timeout=120)
+        self.client = ArangoClient(
+            hosts=self.config["host"],
+            http_client=AioHTTPClient(connector=connector),
+            serializer=OrjsonSerializer(),
+            deserializer=OrjsonDeserializer(),
+        )
         auth = Auth(username=self.config["username"], password=self.config["password"])
         sys_db = await self.client.db("_system", auth=auth)
         if not await sys_db.has_database(self.config["database"]):
@@ -45,19 +207,23 @@ class ArangoTPCH:
         self.db = await self.client.db(self.config["database"], auth=auth)
 
 
-    async def asetup(self) -> None:
+    async def asetup_collections(self) -> None:
         for coll in VERTICES:
             if not await self.db.has_collection(coll):
                 await self.db.create_collection(coll, col_type=CollectionType.DOCUMENT)
+            self.collections[coll] = self.db.collection(coll)
 
         for coll in EDGES:
             if not await self.db.has_collection(coll):
                 await self.db.create_collection(coll, col_type=CollectionType.EDGE)
+            self.collections[coll] = self.db.collection(coll)
 
+    async def asetup_indices(self) -> None:
+        """Create indices once the data is loaded, so imports do not maintain them row by row"""
         print("Creating indices...")
         for name, indices in INDICES.items():
-            if await self.db.has_collection(name):
-                collection = self.db.collection(name)
+            if name in self.collections:
+                collection = self.collections[name]
                 for field, unique in indices:
                     try:
                         await collection.add_index(
@@ -76,19 +242,31 @@ class ArangoTPCH:
             for coll in VERTICES + EDGES:
                 if await self.db.has_collection(coll):
                     await self.db.delete_collection(coll)
+        self.collections.clear()
 
 
     async def aload(self):
         print("Starting TPC-H data load for ArangoDB...")
 
-        await self.aload_region()
-        await self.aload_nation()
-        await self.aload_supplier()
-        await self.aload_customer()
-        await self.aload_part()
-        await self.aload_partsupp()
-        await self.aload_orders()
-        await self.aload_lineitem()
+        # The dataset can be regenerated, so skip syncing to disk during the load and restore it afterwards
+        collections = list(self.collections.values())
+        properties = await asyncio.gather(*(collection.properties() for collection in collections))
+
+        try:
+            # Inside the try, so collections already switched are restored if switching another one fails
+            await asyncio.gather(*(collection.configure(wait_for_sync=False) for collection in collections))
+
+            # Tables only wait for the tables they reference, independent ones load concurrently
+            await self.aload_region()
+            await self.aload_nation()
+            await asyncio.gather(self.aload_supplier(), self.aload_customer(), self.aload_part())
+            await asyncio.gather(self.aload_partsupp(), self.aload_orders())
+            await self.aload_lineitem()
+        finally:
+            await asyncio.gather(*(
+                collection.configure(wait_for_sync=props.wait_for_sync)
+                for collection, props in zip(collections, properties)
+            ))
 
         print("All tables loaded successfully!")
 
@@ -107,384 +285,236 @@ class ArangoTPCH:
         if self.client:
             await self.client.close()
 
+    async def abulk_import(self, collection: str, docs: bytes) -> None:
+        """Import NDJSON documents through ArangoDB's bulk /_api/import endpoint"""
+        await self.collections[collection].import_bulk(docs, doc_type="documents", wait_for_sync=False)
+
     async def aload_region(self) -> None:
         """Load region.tbl"""
         print("Loading region data...")
         path = DATA_PATH / "region.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(3))
-        df.columns = ["r_regionkey", "r_name", "r_comment"]
-
-        # Convert to list of dictionaries and add _key field for ArangoDB
-        data = []
-        for _, row in df.iterrows():
-            doc = {
-                "_key": str(row["r_regionkey"]),
-                "r_regionkey": row["r_regionkey"],
-                "r_name": row["r_name"],
-                "r_comment": row["r_comment"]
-            }
-            data.append(doc)
-
-        # Insert data into ArangoDB collection
-        region_collection = self.db.collection("region")
-        await region_collection.insert_many(data)
-        print(f"Loaded {len(data)} regions")
+        table = read_tbl(path, SCHEMAS["region"])
+
+        # Add _key field for ArangoDB and import the documents
+        region_docs = table.add_column(0, "_key", key_column(table["r_regionkey"]))
+        await self.abulk_import("region", to_ndjson(region_docs))
+        print(f"Loaded {table.num_rows} regions")
 
     async def aload_nation(self) -> None:
         """Load nation.tbl"""
         print("Loading nation data...")
         path = DATA_PATH / "nation.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(4))
-        df.columns = ["n_nationkey", "n_name", "n_regionkey", "n_comment"]
-
-        # Convert to list of dictionaries and add _key field for ArangoDB
-        nation_data = []
-        edge_data = []
-
-        for _, row in df.iterrows():
-            # Create nation document
-            nation_doc = {
-                "_key": str(row["n_nationkey"]),
-                "n_nationkey": row["n_nationkey"],
-                "n_name": row["n_name"],
-                "n_comment": row["n_comment"]
-            }
-            nation_data.append(nation_doc)
-
-            # Create edge from nation to region
-            edge_doc = {
-                "_from": f"nation/{row['n_nationkey']}",
-                "_to": f"region/{row['n_regionkey']}",
-                "n_regionkey": row["n_regionkey"]
-            }
-            edge_data.append(edge_doc)
-
-        # Insert nations
-        nation_collection = self.db.collection("nation")
-        await nation_collection.insert_many(nation_data)
-        print(f"Loaded {len(nation_data)} nations")
-
-        # Insert nation-region relationships
-        nation_region_collection = self.db.collection("nation_region")
-        await nation_region_collection.insert_many(edge_data)
-        print(f"Created {len(edge_data)} nation-region relationships")
+        table = read_tbl(path, SCHEMAS["nation"])
+
+        # Nation documents keyed by nationkey, region reference moves to the edge
+        nation_keys = key_column(table["n_nationkey"])
+        nation_docs = table.drop_columns(["n_regionkey"]).add_column(0, "_key", nation_keys)
+        edge_docs = pa.table({
+            "_from": id_column("nation", nation_keys),
+            "_to": id_column("region", key_column(table["n_regionkey"])),
+            "n_regionkey": table["n_regionkey"],
+        })
+
+        # Import nations and nation-region relationships concurrently
+        await asyncio.gather(
+            self.abulk_import("nation", to_ndjson(nation_docs)),
+            self.abulk_import("nation_region", to_ndjson(edge_docs)),
+        )
+        print(f"Loaded {nation_docs.num_rows} nations")
+        print(f"Created {edge_docs.num_rows} nation-region relationships")
 
     async def aload_supplier(self) -> None:
         """Load supplier.tbl"""
         print("Loading supplier data...")
         path = DATA_PATH / "supplier.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(7))
-        df.columns = ["s_suppkey", "s_name", "s_address", "s_nationkey", "s_phone", "s_acctbal", "s_comment"]
-
-        # Convert to list of dictionaries and add _key field for ArangoDB
-        supplier_data = []
-        edge_data = []
-
-        for _, row in df.iterrows():
-            # Create supplier document
-            supplier_doc = {
-                "_key": str(row["s_suppkey"]),
-                "s_suppkey": row["s_suppkey"],
-                "s_name": row["s_name"],
-                "s_address": row["s_address"],
-                "s_phone": row["s_phone"],
-                "s_acctbal": row["s_acctbal"],
-                "s_comment": row["s_comment"]
-            }
-            supplier_data.append(supplier_doc)
-
-            # Create edge from supplier to nation
-            edge_doc = {
-                "_from": f"supplier/{row['s_suppkey']}",
-                "_to": f"nation/{row['s_nationkey']}",
-                "s_nationkey": row["s_nationkey"]
-            }
-            edge_data.append(edge_doc)
-
-        # Insert suppliers
-        supplier_collection = self.db.collection("supplier")
-        await supplier_collection.insert_many(supplier_data)
-        print(f"Loaded {len(supplier_data)} suppliers")
-
-        # Insert supplier-nation relationships
-        supplier_nation_collection = self.db.collection("supplier_nation")
-        await supplier_nation_collection.insert_many(edge_data)
-        print(f"Created {len(edge_data)} supplier-nation relationships")
+        table = read_tbl(path, SCHEMAS["supplier"])
+
+        # Supplier documents keyed by suppkey, nation reference moves to the edge
+        supplier_keys = key_column(table["s_suppkey"])
+        supplier_docs = table.drop_columns(["s_nationkey"]).add_column(0, "_key", supplier_keys)
+        edge_docs = pa.table({
+            "_from": id_column("supplier", supplier_keys),
+            "_to": id_column("nation", key_column(table["s_nationkey"])),
+            "s_nationkey": table["s_nationkey"],
+        })
+
+        # Import suppliers and supplier-nation relationships concurrently
+        await asyncio.gather(
+            self.abulk_import("supplier", to_ndjson(supplier_docs)),
+            self.abulk_import("supplier_nation", to_ndjson(edge_docs)),
+        )
+        print(f"Loaded {supplier_docs.num_rows} suppliers")
+        print(f"Created {edge_docs.num_rows} supplier-nation relationships")
 
     async def aload_customer(self) -> None:
         """Load customer.tbl"""
         print("Loading customer data...")
         path = DATA_PATH / "customer.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(8))
-        df.columns = ["c_custkey", "c_name", "c_address", "c_nationkey", "c_phone", "c_acctbal", "c_mktsegment", "c_comment"]
-
-        # Convert to list of dictionaries and add _key field for ArangoDB
-        customer_data = []
-        edge_data = []
-
-        for _, row in df.iterrows():
-            # Create customer document
-            customer_doc = {
-                "_key": str(row["c_custkey"]),
-                "c_custkey": row["c_custkey"],
-                "c_name": row["c_name"],
-                "c_address": row["c_address"],
-                "c_phone": row["c_phone"],
-                "c_acctbal": row["c_acctbal"],
-                "c_mktsegment": row["c_mktsegment"],
-                "c_comment": row["c_comment"]
-            }
-            customer_data.append(customer_doc)
-
-            # Create edge from customer to nation
-            edge_doc = {
-                "_from": f"customer/{row['c_custkey']}",
-                "_to": f"nation/{row['c_nationkey']}",
-                "c_nationkey": row["c_nationkey"]
-            }
-            edge_data.append(edge_doc)
-
-        # Insert customers
-        customer_collection = self.db.collection("customer")
-        await customer_collection.insert_many(customer_data)
-        print(f"Loaded {len(customer_data)} customers")
-
-        # Insert customer-nation relationships
-        customer_nation_collection = self.db.collection("customer_nation")
-        await customer_nation_collection.insert_many(edge_data)
-        print(f"Created {len(edge_data)} customer-nation relationships")
+        table = read_tbl(path, SCHEMAS["customer"])
+
+        # Customer documents keyed by custkey, nation reference moves to the edge
+        customer_keys = key_column(table["c_custkey"])
+        customer_docs = table.drop_columns(["c_nationkey"]).add_column(0, "_key", customer_keys)
+        edge_docs = pa.table({
+            "_from": id_column("customer", customer_keys),
+            "_to": id_column("nation", key_column(table["c_nationkey"])),
+            "c_nationkey": table["c_nationkey"],
+        })
+
+        # Import customers and customer-nation relationships concurrently
+        await asyncio.gather(
+            self.abulk_import("customer", to_ndjson(customer_docs)),
+            self.abulk_import("customer_nation", to_ndjson(edge_docs)),
+        )
+        print(f"Loaded {customer_docs.num_rows} customers")
+        print(f"Created {edge_docs.num_rows} customer-nation relationships")
 
     async def aload_part(self) -> None:
         """Load part.tbl"""
         print("Loading part data...")
         path = DATA_PATH / "part.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(9))
-        df.columns = ["p_partkey", "p_name", "p_mfgr", "p_brand", "p_type", "p_size", "p_container", "p_retailprice", "p_comment"]
-
-        # Convert to list of dictionaries and add _key field for ArangoDB
-        data = []
-        for _, row in df.iterrows():
-            doc = {
-                "_key": str(row["p_partkey"]),
-                "p_partkey": row["p_partkey"],
-                "p_name": row["p_name"],
-                "p_mfgr": row["p_mfgr"],
-                "p_brand": row["p_brand"],
-                "p_type": row["p_type"],
-                "p_size": row["p_size"],
-                "p_container": row["p_container"],
-                "p_retailprice": row["p_retailprice"],
-                "p_comment": row["p_comment"]
-            }
-            data.append(doc)
-
-        # Insert data into ArangoDB collection
-        part_collection = self.db.collection("part")
-        await part_collection.insert_many(data)
-        print(f"Loaded {len(data)} parts")
+        table = read_tbl(path, SCHEMAS["part"])
+
+        # Add _key field for ArangoDB and import the documents
+        part_docs = table.add_column(0, "_key", key_column(table["p_partkey"]))
+        await self.abulk_import("part", to_ndjson(part_docs))
+        print(f"Loaded {table.num_rows} parts")
 
     async def aload_partsupp(self) -> None:
         """Load partsupp.tbl"""
         print("Loading partsupp data...")
         path = DATA_PATH / "partsupp.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(5))
-        df.columns = ["ps_partkey", "ps_suppkey", "ps_availqty", "ps_supplycost", "ps_comment"]
-
-        # Convert to list of dictionaries and add _key field for ArangoDB
-        partsupp_data = []
-        part_edges = []
-        supplier_edges = []
-
-        for _, row in df.iterrows():
-            # Create partsupp document with composite key
-            partsupp_key = f"{row['ps_partkey']}_{row['ps_suppkey']}"
-            partsupp_doc = {
-                "_key": partsupp_key,
-                "ps_partkey": row["ps_partkey"],
-                "ps_suppkey": row["ps_suppkey"],
-                "ps_availqty": row["ps_availqty"],
-                "ps_supplycost": row["ps_supplycost"],
-                "ps_comment": row["ps_comment"]
-            }
-            partsupp_data.append(partsupp_doc)
-
-            # Create edge from partsupp to part
-            part_edge = {
-                "_from": f"partsupp/{partsupp_key}",
-                "_to": f"part/{row['ps_partkey']}",
-                "ps_partkey": row["ps_partkey"]
-            }
-            part_edges.append(part_edge)
-
-            # Create edge from partsupp to supplier
-            supplier_edge = {
-                "_from": f"partsupp/{partsupp_key}",
-                "_to": f"supplier/{row['ps_suppkey']}",
-                "ps_suppkey": row["ps_suppkey"]
-            }
-            supplier_edges.append(supplier_edge)
-
-        # Insert partsupp documents
-        partsupp_collection = self.db.collection("partsupp")
-        await partsupp_collection.insert_many(partsupp_data)
-        print(f"Loaded {len(partsupp_data)} partsupp records")
-
-        # Insert partsupp-part relationships
-        partsupp_part_collection = self.db.collection("partsupp_part")
-        await partsupp_part_collection.insert_many(part_edges)
-        print(f"Created {len(part_edges)} partsupp-part relationships")
-
-        # Insert partsupp-supplier relationships
-        partsupp_supplier_collection = self.db.collection("partsupp_supplier")
-        await partsupp_supplier_collection.insert_many(supplier_edges)
-        print(f"Created {len(supplier_edges)} partsupp-supplier relationships")
+        table = read_tbl(path, SCHEMAS["partsupp"])
+
+        # Partsupp documents with composite key
+        part_keys = key_column(table["ps_partkey"])
+        supplier_keys = key_column(table["ps_suppkey"])
+        partsupp_keys = key_column(part_keys, supplier_keys)
+        partsupp_ids = id_column("partsupp", partsupp_keys)
+        partsupp_docs = table.add_column(0, "_key", partsupp_keys)
+        part_edges = pa.table({
+            "_from": partsupp_ids,
+            "_to": id_column("part", part_keys),
+            "ps_partkey": table["ps_partkey"],
+        })
+        supplier_edges = pa.table({
+            "_from": partsupp_ids,
+            "_to": id_column("supplier", supplier_keys),
+            "ps_suppkey": table["ps_suppkey"],
+        })
+
+        # Import partsupp documents and their part/supplier relationships concurrently
+        await asyncio.gather(
+            self.abulk_import("partsupp", to_ndjson(partsupp_docs)),
+            self.abulk_import("partsupp_part", to_ndjson(part_edges)),
+            self.abulk_import("partsupp_supplier", to_ndjson(supplier_edges)),
+        )
+        print(f"Loaded {partsupp_docs.num_rows} partsupp records")
+        print(f"Created {part_edges.num_rows} partsupp-part relationships")
+        print(f"Created {supplier_edges.num_rows} partsupp-supplier relationships")
 
     async def aload_orders(self) -> None:
         """Load orders.tbl"""
         print("Loading orders data...")
         path = DATA_PATH / "orders.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(9))
-        df.columns = ["o_orderkey", "o_custkey", "o_orderstatus", "o_totalprice", "o_orderdate", "o_orderpriority", "o_clerk", "o_shippriority", "o_comment"]
-
-        # Convert to list of dictionaries and add _key field for ArangoDB
-        orders_data = []
-        edge_data = []
-
-        for _, row in df.iterrows():
-            # Create order document
-            order_doc = {
-                "_key": str(row["o_orderkey"]),
-                "o_orderkey": row["o_orderkey"],
-                "o_orderstatus": row["o_orderstatus"],
-                "o_totalprice": row["o_totalprice"],
-                "o_orderdate": row["o_orderdate"],
-                "o_orderpriority": row["o_orderpriority"],
-                "o_clerk": row["o_clerk"],
-                "o_shippriority": row["o_shippriority"],
-                "o_comment": row["o_comment"]
-            }
-            orders_data.append(order_doc)
-
-            # Create edge from customer to order
-            edge_doc = {
-                "_from": f"customer/{row['o_custkey']}",
-                "_to": f"orders/{row['o_orderkey']}",
-                "o_custkey": row["o_custkey"]
-            }
-            edge_data.append(edge_doc)
-
-        # Insert orders
-        orders_collection = self.db.collection("orders")
-        await orders_collection.insert_many(orders_data)
-        print(f"Loaded {len(orders_data)} orders")
-
-        # Insert customer-orders relationships
-        customer_orders_collection = self.db.collection("customer_orders")
-        await customer_orders_collection.insert_many(edge_data)
-        print(f"Created {len(edge_data)} customer-orders relationships")
+        table = read_tbl(path, SCHEMAS["orders"])
+
+        # Order documents keyed by orderkey, customer reference moves to the edge
+        order_keys = key_column(table["o_orderkey"])
+        orders_docs = table.drop_columns(["o_custkey"]).add_column(0, "_key", order_keys)
+        edge_docs = pa.table({
+            "_from": id_column("customer", key_column(table["o_custkey"])),
+            "_to": id_column("orders", order_keys),
+            "o_custkey": table["o_custkey"],
+        })
+
+        # Import orders and customer-orders relationships concurrently
+        await asyncio.gather(
+            self.abulk_import("orders", to_ndjson(orders_docs)),
+            self.abulk_import("customer_orders", to_ndjson(edge_docs)),
+        )
+        print(f"Loaded {orders_docs.num_rows} orders")
+        print(f"Created {edge_docs.num_rows} customer-orders relationships")
 
     async def aload_lineitem(self) -> None:
         """Load lineitem.tbl"""
         print("Loading lineitem data...")
         path = DATA_PATH / "lineitem.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(16))
-        df.columns = ["l_orderkey", "l_partkey", "l_suppkey", "l_linenumber", "l_quantity", "l_extendedprice",
-                      "l_discount", "l_tax", "l_returnflag", "l_linestatus", "l_shipdate", "l_commitdate",
-                      "l_receiptdate", "l_shipinstruct", "l_shipmode", "l_comment"]
-
-        # Process in batches to avoid connection timeout
-        batch_size = 1000
-        total_rows = len(df)
-        total_batches = (total_rows + batch_size - 1) // batch_size
-
-        print(f"Processing {total_rows} lineitem records in {total_batches} batches of {batch_size}")
-
-        for batch_num in range(total_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min((batch_num + 1) * batch_size, total_rows)
-            batch_df = df.iloc[start_idx:end_idx]
-
-            # Convert to list of dictionaries and add _key field for ArangoDB
-            lineitem_data = []
-            order_edges = []
-            part_edges = []
-            supplier_edges = []
-
-            for _, row in batch_df.iterrows():
-                # Create lineitem document with composite key
-                lineitem_key = f"{row['l_orderkey']}_{row['l_linenumber']}"
-                lineitem_doc = {
-                    "_key": lineitem_key,
-                    "l_orderkey": row["l_orderkey"],
-                    "l_partkey": row["l_partkey"],
-                    "l_suppkey": row["l_suppkey"],
-                    "l_linenumber": row["l_linenumber"],
-                    "l_quantity": row["l_quantity"],
-                    "l_extendedprice": row["l_extendedprice"],
-                    "l_discount": row["l_discount"],
-                    "l_tax": row["l_tax"],
-                    "l_returnflag": row["l_returnflag"],
-                    "l_linestatus": row["l_linestatus"],
-                    "l_shipdate": row["l_shipdate"],
-                    "l_commitdate": row["l_commitdate"],
-                    "l_receiptdate": row["l_receiptdate"],
-                    "l_shipinstruct": row["l_shipinstruct"],
-                    "l_shipmode": row["l_shipmode"],
-                    "l_comment": row["l_comment"]
-                }
-                lineitem_data.append(lineitem_doc)
-
-                # Create edge from order to lineitem
-                order_edge = {
-                    "_from": f"orders/{row['l_orderkey']}",
-                    "_to": f"lineitem/{lineitem_key}",
-                    "l_orderkey": row["l_orderkey"]
-                }
-                order_edges.append(order_edge)
-
-                # Create edge from lineitem to part
-                part_edge = {
-                    "_from": f"lineitem/{lineitem_key}",
-                    "_to": f"part/{row['l_partkey']}",
-                    "l_partkey": row["l_partkey"]
-                }
-                part_edges.append(part_edge)
-
-                # Create edge from lineitem to supplier
-                supplier_edge = {
-                    "_from": f"lineitem/{lineitem_key}",
-                    "_to": f"supplier/{row['l_suppkey']}",
-                    "l_suppkey": row["l_suppkey"]
-                }
-                supplier_edges.append(supplier_edge)
-
-            # Insert lineitem documents
-            lineitem_collection = self.db.collection("lineitem")
-            await lineitem_collection.insert_many(lineitem_data)
-
-            # Insert order-lineitem relationships
-            order_lineitems_collection = self.db.collection("order_lineitems")
-            await order_lineitems_collection.insert_many(order_edges)
-
-            # Insert lineitem-part relationships
-            lineitem_part_collection = self.db.collection("lineitem_part")
-            await lineitem_part_collection.insert_many(part_edges)
-
-            # Insert lineitem-supplier relationships
-            lineitem_supplier_collection = self.db.collection("lineitem_supplier")
-            await lineitem_supplier_collection.insert_many(supplier_edges)
-
-            print(f"Completed batch {batch_num + 1}/{total_batches} ({len(lineitem_data)} records)")
+        # Stream the file in batches, so only the batches in progress are held in memory
+        batch_size = self.config.get("batch_size", DEFAULT_BATCH_SIZE)
+        batches = stream_tbl(path, SCHEMAS["lineitem"], batch_size=batch_size)
+
+        print(f"Processing lineitem records in batches of up to {batch_size}")
+
+        # Payloads are built in worker processes, a few batches ahead of the one being imported
+        loop = asyncio.get_running_loop()
+        building: deque[tuple[int, int, asyncio.Future]] = deque()
+        pending = None
+        total_rows = 0
+        # One worker per batch in flight, started from a forkserver rather than forking this process,
+        # which holds the event loop, open sockets and pyarrow's threads
+        with ProcessPoolExecutor(max_workers=MAX_BUILDS_IN_FLIGHT,
+                                 mp_context=multiprocessing.get_context("forkserver")) as executor:
+            try:
+                batch_num = 0
+                # Parsing the next CSV block happens off the event loop, so running imports keep going
+                while (batch_table := await asyncio.to_thread(next, batches, None)) is not None:
+                    total_rows += batch_table.num_rows
+                    building.append((batch_num, batch_table.num_rows,
+                                     loop.run_in_executor(executor, build_lineitem_payloads, batch_table)))
+                    batch_num += 1
+                    if len(building) >= MAX_BUILDS_IN_FLIGHT:
+                        pending = await self.aschedule_lineitem_batch(*building.popleft(), pending)
+
+                while building:
+                    pending = await self.aschedule_lineitem_batch(*building.popleft(), pending)
+
+                if pending is not None:
+                    await pending
+            finally:
+                # After a failure, drop the batches still being built and stop the import in flight,
+                # so nothing outlives the load and every error is retrieved
+                in_flight = [payloads for _, _, payloads in building]
+                if pending is not None:
+                    in_flight.append(pending)
+                for future in in_flight:
+                    future.cancel()
+                await asyncio.gather(*in_flight, return_exceptions=True)
 
         print(f"Loaded {total_rows} lineitem records and all relationships successfully!")
 
+    async def aschedule_lineitem_batch(self, batch_num: int, num_records: int, payloads: asyncio.Future,
+                                       pending: asyncio.Task | None) -> asyncio.Task:
+        """Wait for a batch's payloads and start importing them once the previous import is done"""
+        lineitem_data, order_edges, part_edges, supplier_edges = await payloads
+        if pending is not None:
+            await pending
+        task = asyncio.create_task(self.ainsert_lineitem_batch(
+            batch_num, num_records, lineitem_data, order_edges, part_edges, supplier_edges
+        ))
+        # Yield once so the batch hits the wire before the next one is awaited
+        await asyncio.sleep(0)
+        return task
+
+    async def ainsert_lineitem_batch(self, batch_num: int, num_records: int, lineitem_data: bytes,
+                                     order_edges: bytes, part_edges: bytes, supplier_edges: bytes) -> None:
+        """Import one lineitem batch and its order/part/supplier relationships concurrently"""
+        await asyncio.gather(
+            self.abulk_import("lineitem", lineitem_data),
+            self.abulk_import("order_lineitems", order_edges),
+            self.abulk_import("lineitem_part", part_edges),
+            self.abulk_import("lineitem_supplier", supplier_edges),
+        )
+        print(f"Completed batch {batch_num + 1} ({num_records} records)")
+
 
 async def main():
     db = ArangoTPCH()
     await db.aconnect()
     await db.aclear()
-    await db.asetup()
+    await db.asetup_collections()
     await db.aload()
+    await db.asetup_indices()
     await db.agraph()
     await db.aclose()
 
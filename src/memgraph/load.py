@@ -1,23 +1,90 @@
+import queue
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
-import pandas as pd
+import pyarrow as pa
+from pyarrow import csv
 import mgclient
 
 DATA_PATH = Path(__file__).parent.parent.parent / "tpch-osx" / "dbgen"
 
+# Column names of every TPC-H table, in file order
+SCHEMAS: dict[str, list[str]] = {
+    "region": ["regionkey", "name", "comment"],
+    "nation": ["nationkey", "name", "regionkey", "comment"],
+    "supplier": ["suppkey", "name", "address", "nationkey", "phone", "acctbal", "comment"],
+    "customer": ["custkey", "name", "address", "nationkey", "phone", "acctbal", "mktsegment", "comment"],
+    "part": ["partkey", "name", "mfgr", "brand", "type", "size", "container", "retailprice", "comment"],
+    "partsupp": ["partkey", "suppkey", "availqty", "supplycost", "comment"],
+    "orders": [
+        "orderkey", "custkey", "orderstatus", "totalprice", "orderdate", "orderpriority", "clerk",
+        "shippriority", "comment",
+    ],
+    "lineitem": [
+        "orderkey", "partkey", "suppkey", "linenumber", "quantity", "extendedprice", "discount", "tax",
+        "returnflag", "linestatus", "shipdate", "commitdate", "receiptdate", "shipinstruct", "shipmode",
+        "comment",
+    ],
+}
+
+# Numeric TPC-H columns, every other column (including dates) is read as a string
+COLUMN_TYPES = {
+    "regionkey": pa.int64(), "nationkey": pa.int64(), "suppkey": pa.int64(), "custkey": pa.int64(),
+    "partkey": pa.int64(), "orderkey": pa.int64(), "linenumber": pa.int64(),
+    "size": pa.int64(), "availqty": pa.int64(), "shippriority": pa.int64(), "quantity": pa.int64(),
+    "acctbal": pa.float64(), "retailprice": pa.float64(), "supplycost": pa.float64(), "totalprice": pa.float64(),
+    "extendedprice": pa.float64(), "discount": pa.float64(), "tax": pa.float64(),
+}
+
+# In transactional mode, concurrent batches touching the same node can be rejected by Memgraph and have to be retried
+MAX_RETRIES = 10
+
+
+def read_tbl(path: Path, columns: list[str]) -> pa.Table:
+    """Read a pipe-delimited TPC-H .tbl file, dropping the trailing empty column"""
+    column_types = {column: COLUMN_TYPES.get(column, pa.string()) for column in columns}
+    return csv.read_csv(
+        path,
+        read_options=csv.ReadOptions(column_names=columns + ["_trailing"], block_size=64 << 20),
+        parse_options=csv.ParseOptions(delimiter="|"),
+        convert_options=csv.ConvertOptions(include_columns=columns, column_types=column_types),
+    )
+
+
+def row_params(rows: list[dict], start: int, size: int) -> dict[str, list]:
+    """Batch parameters as a list of rows, for queries that UNWIND $rows"""
+    return {"rows": rows[start:start + size]}
+
+
+def column_params(table: pa.Table, start: int, size: int) -> dict[str, list]:
+    """Batch parameters as one list per column, for queries that index each column by row number"""
+    return table.slice(start, size).to_pydict()
+
 
 class MemgraphTPCH:
-    def __init__(self, config: dict[str, Any] | None = None) -> None:
+    def __init__(self, config: dict[str, Any] | None = None, workers: int = 4) -> None:
         self.config = config or {
             "host": "127.0.0.1",
             "port": 7687,
         }
+        self.workers = workers
         self.connection = None
         self.cursor = None
+        # Extra connections used to run load batches in parallel
+        self.pool: queue.Queue | None = None
+        # Set once the database has been cleared, so loaders can CREATE instead of MERGE
+        self.cold_load = False
+        # Set while the storage mode is IN_MEMORY_ANALYTICAL, where batches are applied without transactions
+        self.analytical = False
 
     def connect(self) -> None:
         self.connection = mgclient.connect(**self.config)
         self.cursor = self.connection.cursor()
+        self.pool = queue.Queue()
+        for _ in range(self.workers):
+            self.pool.put(mgclient.connect(**self.config))
 
     def setup(self) -> None:
         self.setup_indices()
@@ -52,184 +119,298 @@ class MemgraphTPCH:
         # Reset autocommit back to default (False) for data loading
         # self.connection.autocommit = False
 
+    def execute_autocommit(self, query: str) -> None:
+        """Run a query that Memgraph refuses inside an explicit transaction"""
+        # Autocommit can only be toggled once the open transaction is finished
+        self.connection.commit()
+        self.connection.autocommit = True
+        try:
+            self.cursor.execute(query)
+        finally:
+            self.connection.autocommit = False
+
+    def storage_mode(self, mode: str) -> None:
+        self.execute_autocommit(f"STORAGE MODE {mode}")
+        self.analytical = mode == "IN_MEMORY_ANALYTICAL"
+
     def clear(self):
         try:
-            self.cursor.execute("MATCH (n) DETACH DELETE n")
+            # DROP GRAPH discards the whole graph at once instead of deleting it node by node,
+            # but it is only available in analytical mode
+            self.storage_mode("IN_MEMORY_ANALYTICAL")
+            try:
+                self.execute_autocommit("DROP GRAPH")
+            finally:
+                self.storage_mode("IN_MEMORY_TRANSACTIONAL")
+            self.cold_load = True
         except Exception as e:
             print(f"Clear database warning: {e}")
 
-    def batch_load(self, query: str, data: list[dict], table_name: str, batch_size: int = 1000) -> None:
-        """Load data in batches using UNWIND with logging"""
+    def node_ids(self, label: str, key: str) -> dict[int, int]:
+        """Map the key property of every node with the given label to its internal id"""
+        self.cursor.execute(f"MATCH (n:{label}) RETURN n.{key}, id(n)")
+        ids = dict(self.cursor.fetchall())
+        self.connection.commit()
+        return ids
+
+    def batch_load(self, query: str, data: list[dict] | pa.Table, table_name: str, batch_size: int = 5000,
+                   params: Callable[[Any, int, int], dict[str, list]] = row_params) -> None:
+        """Load data in batches using UNWIND with logging, running batches in parallel on pooled connections.
+
+        params builds the query parameters of the batch starting at a given row, as rows by default.
+        """
         total_batches = (len(data) + batch_size - 1) // batch_size
-        for i in range(0, len(data), batch_size):
-            batch = data[i:i + batch_size]
-            self.cursor.execute(query, {"rows": batch})
-            self.connection.commit()  # Commit each batch
-            print(f"{table_name}: Loaded batch {i // batch_size + 1} of {total_batches}")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self.load_batch, query, params(data, i, batch_size))
+                       for i in range(0, len(data), batch_size)]
+            for loaded, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                print(f"{table_name}: Loaded batch {loaded} of {total_batches}")
+
+    def load_batch(self, query: str, params: dict[str, list]) -> None:
+        """Run one UNWIND batch on a pooled connection and commit it"""
+        connection = self.pool.get()
+        try:
+            cursor = connection.cursor()
+            for attempt in range(MAX_RETRIES):
+                try:
+                    cursor.execute(query, params)
+                    connection.commit()  # Commit each batch
+                    return
+                except mgclient.DatabaseError as e:
+                    connection.rollback()
+                    # Analytical mode never reports conflicts and cannot roll back a partly applied batch,
+                    # so retrying there would insert rows twice
+                    if self.analytical or "conflicting transactions" not in str(e) or attempt == MAX_RETRIES - 1:
+                        raise
+                    time.sleep(0.01 * 2 ** attempt)
+        finally:
+            self.pool.put(connection)
 
     def aload_region(self):
         """Load region.tbl"""
         path = DATA_PATH / "region.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(3))
-        df.columns = ["regionkey", "name", "comment"]
-        data = df.to_dict(orient="records")
-
-        query = """
-            UNWIND $rows AS row
-            MERGE (r:Region {regionkey: row.regionkey})
-            SET r.name = row.name, r.comment = row.comment
-        """
+        data = read_tbl(path, SCHEMAS["region"]).to_pylist()
+
+        if self.cold_load:
+            query = """
+                UNWIND $rows AS row
+                CREATE (r:Region {regionkey: row.regionkey, name: row.name, comment: row.comment})
+            """
+        else:
+            query = """
+                UNWIND $rows AS row
+                MERGE (r:Region {regionkey: row.regionkey})
+                SET r.name = row.name, r.comment = row.comment
+            """
         self.batch_load(query, data, "Region")
 
     def aload_nation(self):
         """Load nation.tbl"""
         path = DATA_PATH / "nation.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(4))
-        df.columns = ["nationkey", "name", "regionkey", "comment"]
-        data = df.to_dict(orient="records")
-
-        query = """
-            UNWIND $rows AS row
-            MERGE (n:Nation {nationkey: row.nationkey})
-            SET n.name = row.name, n.comment = row.comment
-            WITH n, row
-            MATCH (r:Region {regionkey: row.regionkey})
-            MERGE (n)-[:BELONGS_TO]->(r)
-        """
+        data = read_tbl(path, SCHEMAS["nation"]).to_pylist()
+
+        if self.cold_load:
+            query = """
+                UNWIND $rows AS row
+                CREATE (n:Nation {nationkey: row.nationkey, name: row.name, comment: row.comment})
+                WITH n, row
+                MATCH (r:Region {regionkey: row.regionkey})
+                CREATE (n)-[:BELONGS_TO]->(r)
+            """
+        else:
+            query = """
+                UNWIND $rows AS row
+                MERGE (n:Nation {nationkey: row.nationkey})
+                SET n.name = row.name, n.comment = row.comment
+                WITH n, row
+                MATCH (r:Region {regionkey: row.regionkey})
+                MERGE (n)-[:BELONGS_TO]->(r)
+            """
         self.batch_load(query, data, "Nation")
 
     def aload_supplier(self):
         """Load supplier.tbl"""
         path = DATA_PATH / "supplier.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(7))
-        df.columns = ["suppkey", "name", "address", "nationkey", "phone", "acctbal", "comment"]
-        data = df.to_dict(orient="records")
-
-        query = """
-            UNWIND $rows AS row
-            MERGE (s:Supplier {suppkey: row.suppkey})
-            SET s.name = row.name, s.address = row.address, s.phone = row.phone,
-                s.acctbal = row.acctbal, s.comment = row.comment
-            WITH s, row
-            MATCH (n:Nation {nationkey: row.nationkey})
-            MERGE (s)-[:LOCATED_IN]->(n)
-        """
+        data = read_tbl(path, SCHEMAS["supplier"]).to_pylist()
+
+        if self.cold_load:
+            query = """
+                UNWIND $rows AS row
+                CREATE (s:Supplier {suppkey: row.suppkey, name: row.name, address: row.address, phone: row.phone,
+                                    acctbal: row.acctbal, comment: row.comment})
+                WITH s, row
+                MATCH (n:Nation {nationkey: row.nationkey})
+                CREATE (s)-[:LOCATED_IN]->(n)
+            """
+        else:
+            query = """
+                UNWIND $rows AS row
+                MERGE (s:Supplier {suppkey: row.suppkey})
+                SET s.name = row.name, s.address = row.address, s.phone = row.phone,
+                    s.acctbal = row.acctbal, s.comment = row.comment
+                WITH s, row
+                MATCH (n:Nation {nationkey: row.nationkey})
+                MERGE (s)-[:LOCATED_IN]->(n)
+            """
         self.batch_load(query, data, "Supplier")
 
     def aload_customer(self):
         """Load customer.tbl with nation relationship"""
         path = DATA_PATH / "customer.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(8))
-        df.columns = ["custkey", "name", "address", "nationkey", "phone", "acctbal", "mktsegment", "comment"]
-        data = df.to_dict(orient="records")
-
-        query = """
-            UNWIND $rows AS row
-            MERGE (c:Customer {custkey: row.custkey})
-            SET c.name = row.name, c.address = row.address, c.phone = row.phone,
-                c.acctbal = row.acctbal, c.mktsegment = row.mktsegment, c.comment = row.comment
-            WITH c, row
-            MATCH (n:Nation {nationkey: row.nationkey})
-            MERGE (c)-[:LOCATED_IN]->(n)
-        """
+        data = read_tbl(path, SCHEMAS["customer"]).to_pylist()
+
+        if self.cold_load:
+            query = """
+                UNWIND $rows AS row
+                CREATE (c:Customer {custkey: row.custkey, name: row.name, address: row.address, phone: row.phone,
+                                    acctbal: row.acctbal, mktsegment: row.mktsegment, comment: row.comment})
+                WITH c, row
+                MATCH (n:Nation {nationkey: row.nationkey})
+                CREATE (c)-[:LOCATED_IN]->(n)
+            """
+        else:
+            query = """
+                UNWIND $rows AS row
+                MERGE (c:Customer {custkey: row.custkey})
+                SET c.name = row.name, c.address = row.address, c.phone = row.phone,
+                    c.acctbal = row.acctbal, c.mktsegment = row.mktsegment, c.comment = row.comment
+                WITH c, row
+                MATCH (n:Nation {nationkey: row.nationkey})
+                MERGE (c)-[:LOCATED_IN]->(n)
+            """
         self.batch_load(query, data, "Customer")
 
     def aload_part(self):
         """Load part.tbl"""
         path = DATA_PATH / "part.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(9))
-        df.columns = ["partkey", "name", "mfgr", "brand", "type", "size", "container", "retailprice", "comment"]
-        data = df.to_dict(orient="records")
-
-        query = """
-            UNWIND $rows AS row
-            MERGE (p:Part {partkey: row.partkey})
-            SET p.name = row.name, p.mfgr = row.mfgr, p.brand = row.brand, p.type = row.type,
-                p.size = row.size, p.container = row.container, p.retailprice = row.retailprice,
-                p.comment = row.comment
-        """
+        data = read_tbl(path, SCHEMAS["part"]).to_pylist()
+
+        if self.cold_load:
+            query = """
+                UNWIND $rows AS row
+                CREATE (p:Part {partkey: row.partkey, name: row.name, mfgr: row.mfgr, brand: row.brand, type: row.type,
+                                size: row.size, container: row.container, retailprice: row.retailprice,
+                                comment: row.comment})
+            """
+        else:
+            query = """
+                UNWIND $rows AS row
+                MERGE (p:Part {partkey: row.partkey})
+                SET p.name = row.name, p.mfgr = row.mfgr, p.brand = row.brand, p.type = row.type,
+                    p.size = row.size, p.container = row.container, p.retailprice = row.retailprice,
+                    p.comment = row.comment
+            """
         self.batch_load(query, data, "Part")
 
     def aload_partsupp(self):
         """Load partsupp.tbl"""
         path = DATA_PATH / "partsupp.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(5))
-        df.columns = ["partkey", "suppkey", "availqty", "supplycost", "comment"]
-        data = df.to_dict(orient="records")
-
-        query = """
-            UNWIND $rows AS row
-            MATCH (p:Part {partkey: row.partkey})
-            MATCH (s:Supplier {suppkey: row.suppkey})
-            MERGE (s)-[ps:SUPPLIES]->(p)
-            SET ps.availqty = row.availqty, ps.supplycost = row.supplycost, ps.comment = row.comment
-        """
+        data = read_tbl(path, SCHEMAS["partsupp"]).to_pylist()
+
+        if self.cold_load:
+            query = """
+                UNWIND $rows AS row
+                MATCH (p:Part {partkey: row.partkey})
+                MATCH (s:Supplier {suppkey: row.suppkey})
+                CREATE (s)-[:SUPPLIES {availqty: row.availqty, supplycost: row.supplycost, comment: row.comment}]->(p)
+            """
+        else:
+            query = """
+                UNWIND $rows AS row
+                MATCH (p:Part {partkey: row.partkey})
+                MATCH (s:Supplier {suppkey: row.suppkey})
+                MERGE (s)-[ps:SUPPLIES]->(p)
+                SET ps.availqty = row.availqty, ps.supplycost = row.supplycost, ps.comment = row.comment
+            """
         self.batch_load(query, data, "PartSupp")
 
     def aload_orders(self):
         """Load orders.tbl"""
         path = DATA_PATH / "orders.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(9))
-        df.columns = ["orderkey", "custkey", "orderstatus", "totalprice", "orderdate", "orderpriority", "clerk", "shippriority", "comment"]
-        data = df.to_dict(orient="records")
-
-        query = """
-            UNWIND $rows AS row
-            MERGE (o:Order {orderkey: row.orderkey})
-            SET o.orderstatus = row.orderstatus, o.totalprice = row.totalprice,
-                o.orderdate = row.orderdate, o.orderpriority = row.orderpriority,
-                o.clerk = row.clerk, o.shippriority = row.shippriority, o.comment = row.comment
-            WITH o, row
-            MATCH (c:Customer {custkey: row.custkey})
-            MERGE (c)-[:PLACED]->(o)
-        """
+        data = read_tbl(path, SCHEMAS["orders"]).to_pylist()
+
+        if self.cold_load:
+            query = """
+                UNWIND $rows AS row
+                CREATE (o:Order {orderkey: row.orderkey, orderstatus: row.orderstatus, totalprice: row.totalprice,
+                                 orderdate: row.orderdate, orderpriority: row.orderpriority,
+                                 clerk: row.clerk, shippriority: row.shippriority, comment: row.comment})
+                WITH o, row
+                MATCH (c:Customer {custkey: row.custkey})
+                CREATE (c)-[:PLACED]->(o)
+            """
+        else:
+            query = """
+                UNWIND $rows AS row
+                MERGE (o:Order {orderkey: row.orderkey})
+                SET o.orderstatus = row.orderstatus, o.totalprice = row.totalprice,
+                    o.orderdate = row.orderdate, o.orderpriority = row.orderpriority,
+                    o.clerk = row.clerk, o.shippriority = row.shippriority, o.comment = row.comment
+                WITH o, row
+                MATCH (c:Customer {custkey: row.custkey})
+                MERGE (c)-[:PLACED]->(o)
+            """
         self.batch_load(query, data, "Orders")
 
     def aload_lineitem(self):
         """Load lineitem.tbl"""
         path = DATA_PATH / "lineitem.tbl"
-        df = pd.read_csv(path, sep="|", header=None, usecols=range(16))
-        df.columns = ["orderkey", "partkey", "suppkey", "linenumber", "quantity", "extendedprice",
-                      "discount", "tax", "returnflag", "linestatus", "shipdate", "commitdate",
-                      "receiptdate", "shipinstruct", "shipmode", "comment"]
-        data = df.to_dict(orient="records")
+        table = read_tbl(path, SCHEMAS["lineitem"])
 
+        # Resolve the referenced nodes to internal ids once, so every row is matched by id
+        # instead of three index lookups (unknown keys map to null and match nothing, as before)
+        for column, label, key in [("order_id", "Order", "orderkey"), ("part_id", "Part", "partkey"),
+                                   ("supplier_id", "Supplier", "suppkey")]:
+            ids = self.node_ids(label, key)
+            table = table.append_column(column, pa.array([ids.get(k) for k in table[key].to_pylist()], pa.int64()))
+
+        # Columns are sent as parallel lists and indexed per row, which avoids building a dict per row
         query = """
-            UNWIND $rows AS row
-            MATCH (o:Order {orderkey: row.orderkey})
-            MATCH (p:Part {partkey: row.partkey})
-            MATCH (s:Supplier {suppkey: row.suppkey})
+            UNWIND range(0, size($orderkey) - 1) AS i
+            MATCH (o) WHERE id(o) = $order_id[i]
+            MATCH (p) WHERE id(p) = $part_id[i]
+            MATCH (s) WHERE id(s) = $supplier_id[i]
             CREATE (li:LineItem {
-                orderkey: row.orderkey, partkey: row.partkey, suppkey: row.suppkey,
-                linenumber: row.linenumber, quantity: row.quantity, extendedprice: row.extendedprice,
-                discount: row.discount, tax: row.tax, returnflag: row.returnflag,
-                linestatus: row.linestatus, shipdate: row.shipdate, commitdate: row.commitdate,
-                receiptdate: row.receiptdate, shipinstruct: row.shipinstruct,
-                shipmode: row.shipmode, comment: row.comment
+                orderkey: $orderkey[i], partkey: $partkey[i], suppkey: $suppkey[i],
+                linenumber: $linenumber[i], quantity: $quantity[i], extendedprice: $extendedprice[i],
+                discount: $discount[i], tax: $tax[i], returnflag: $returnflag[i],
+                linestatus: $linestatus[i], shipdate: $shipdate[i], commitdate: $commitdate[i],
+                receiptdate: $receiptdate[i], shipinstruct: $shipinstruct[i],
+                shipmode: $shipmode[i], comment: $comment[i]
             })
             CREATE (o)-[:CONTAINS]->(li)
             CREATE (li)-[:OF_PART]->(p)
             CREATE (li)-[:SUPPLIED_BY]->(s)
         """
-        self.batch_load(query, data, "LineItem")
+        self.batch_load(query, table, "LineItem", params=column_params)
 
     def aload(self):
         """Load all TPC-H tables in correct order (respecting foreign key dependencies)"""
         print("Starting TPC-H data load...")
 
-        # Load in dependency order
-        self.aload_region()
-        self.aload_nation()
-        self.aload_supplier()
-        self.aload_customer()
-        self.aload_part()
-        self.aload_partsupp()
-        self.aload_orders()
-        self.aload_lineitem()
+        # Analytical mode skips the WAL and transaction bookkeeping for the bulk load
+        self.storage_mode("IN_MEMORY_ANALYTICAL")
+        try:
+            # Load in dependency order
+            self.aload_region()
+            self.aload_nation()
+            self.aload_supplier()
+            self.aload_customer()
+            self.aload_part()
+            self.aload_partsupp()
+            self.aload_orders()
+            self.aload_lineitem()
+        finally:
+            # The database is no longer empty, even after a failed load, so further loads have to MERGE
+            self.cold_load = False
+            self.storage_mode("IN_MEMORY_TRANSACTIONAL")
 
         print("All tables loaded successfully!")
 
     def close(self) -> None:
+        while self.pool is not None and not self.pool.empty():
+            self.pool.get().close()
         self.connection.close()
 
 
@@ -17,7 +17,7 @@ class Neo4jDB:
         self.driver = AsyncGraphDatabase.driver(
             uri=self.config["uri"],
             auth=(self.config["user"], self.config["password"]),
-            database=self.config["database"] if "database" in self.config else None,
+            database=self.config.get("database"),
         )
 
     async def arun(self, query: str, params: dict[str, Any] | None = None):
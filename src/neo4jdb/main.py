@@ -1,209 +1,395 @@
+import argparse
 import asyncio
+import sys
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from textwrap import dedent
 from typing import Any
-from neo4j import AsyncDriver, AsyncGraphDatabase, Record
+from neo4j import READ_ACCESS, AsyncDriver, AsyncGraphDatabase, AsyncSession, Record
 from neo4j.graph import Node, Relationship
+import orjson
+import pandas as pd
+
+
+# A. Selection, Projection, Source (of Data)
+# A1. Non-Indexed Columns
+QUERY_A1 = dedent("""
+    MATCH (c:Customer)
+    WHERE c.mktsegment = $segment
+    RETURN c.name, c.address, c.phone
+    LIMIT 10
+""")
+
+# A2. Non-Indexed Columns with complex condition
+QUERY_A2 = dedent("""
+    MATCH (p:Part)
+    WHERE p.type CONTAINS $type AND p.size > $min_size
+    RETURN p.name, p.type, p.size, p.retailprice
+    LIMIT 10
+""")
+
+# A3. Indexed Columns
+QUERY_A3 = dedent("""
+    MATCH (s:Supplier)
+    USING INDEX s:Supplier(suppkey)
+    WHERE s.suppkey IN $keys
+    RETURN s.suppkey, s.name, s.address
+""")
+
+# B. Aggregation
+# B1. COUNT
+QUERY_B1 = dedent("""
+    MATCH (c:Customer)-[:LOCATED_IN]->(n:Nation)
+    RETURN n.name as nation, COUNT(c) as customer_count
+    ORDER BY customer_count DESC
+    LIMIT 5
+""")
+
+# B2. MAX
+QUERY_B2 = dedent("""
+    MATCH (o:Order)
+    RETURN MAX(o.totalprice) as max_order_value,
+           MIN(o.totalprice) as min_order_value,
+           AVG(o.totalprice) as avg_order_value
+""")
+
+# C. Joins
+# C1. Non-Indexed Columns Join
+QUERY_C1 = dedent("""
+    MATCH (c:Customer)-[:LOCATED_IN]->(n:Nation)
+    WHERE c.mktsegment = $segment
+    RETURN c.name, n.name as nation
+    LIMIT 10
+""")
+
+# C2. Indexed Columns Join
+QUERY_C2 = dedent("""
+    MATCH (o:Order)<-[:PLACED]-(c:Customer)
+    USING INDEX o:Order(orderkey)
+    WHERE o.orderkey = $orderkey
+    RETURN o.orderkey, o.totalprice, c.name, c.custkey
+""")
+
+# C3. Complex Join 1
+QUERY_C3 = dedent("""
+    MATCH (c:Customer)-[:PLACED]->(o:Order)-[:CONTAINS]->(li:LineItem)-[:OF_PART]->(p:Part)
+    WHERE p.type CONTAINS $type
+    RETURN c.name, o.orderkey, p.name, li.quantity, li.extendedprice
+    LIMIT 10
+""")
+
+# C4. Complex Join 2
+# One pattern anchored on the single region, so the supplier expansion only starts from its nations
+QUERY_C4 = dedent("""
+    MATCH (r:Region {name: $region})<-[:BELONGS_TO]-(n:Nation)<-[:LOCATED_IN]-(s:Supplier)-[:SUPPLIES]->(p:Part)
+    RETURN s.name, n.name, p.name, p.retailprice
+    LIMIT 10
+""")
+
+# C5. Neighborhood Search
+QUERY_C5 = dedent("""
+    MATCH (c:Customer {custkey: $custkey})-[:PLACED]->(o:Order)-[:CONTAINS]->(li:LineItem)
+    RETURN c.name, COUNT(o) as order_count, SUM(li.extendedprice) as total_spent
+""")
+
+# C6. Shortest Path
+# Bounded depth keeps the search from flooding the graph, and only the labels along the path are returned
+QUERY_C6 = dedent("""
+    MATCH path = shortestPath((s:Supplier {suppkey: $suppkey})-[*..6]-(c:Customer {custkey: $custkey}))
+    RETURN length(path) as path_length, [n IN nodes(path) | labels(n)[0]] as path_labels
+    LIMIT 1
+""")
+
+# C7. Optional Traversal
+QUERY_C7 = dedent("""
+    MATCH (c:Customer)
+    OPTIONAL MATCH (c)-[:PLACED]->(o:Order)
+    RETURN c.name, COUNT(o) as order_count
+    ORDER BY order_count DESC
+    LIMIT 10
+""")
+
+# D. Set Operations
+# D1. Union
+# QUERY_D1 = dedent("""
+#     MATCH (n:Nation)-[:BELONGS_TO]->(r:Region {name: 'AMERICA'})
+#     RETURN n.name as nation, 'AMERICA' as region
+#     UNION
+#     MATCH (n:Nation)-[:BELONGS_TO]->(r:Region {name: 'EUROPE'})
+#     RETURN n.name as nation, 'EUROPE' as region
+#     ORDER BY nation
+#     LIMIT 10
+# """)
+
+# D2. Intersection
+# QUERY_D2 = dedent("""
+#     MATCH (c1:Customer)-[:PLACED]->(o1:Order)-[:CONTAINS]->(li1:LineItem)-[:OF_PART]->(p:Part)
+#     MATCH (c2:Customer)-[:PLACED]->(o2:Order)-[:CONTAINS]->(li2:LineItem)-[:OF_PART]->(p)
+#     WHERE c1.custkey < c2.custkey
+#     RETURN p.name, COUNT(DISTINCT c1) + COUNT(DISTINCT c2) as shared_customers
+#     LIMIT 5
+# """)
+
+# D3. Difference
+QUERY_D3 = dedent("""
+    MATCH (c:Customer)
+    WHERE NOT EXISTS((c)-[:PLACED]->(:Order))
+    RETURN c.name, c.custkey
+    LIMIT 10
+""")
+
+# E. Result Modification
+# E1. Non-Indexed Columns Sorting
+QUERY_E1 = dedent("""
+    MATCH (p:Part)
+    RETURN p.name, p.retailprice
+    ORDER BY p.retailprice DESC
+    LIMIT 10
+""")
+
+# E2. Indexed Columns Sorting
+QUERY_E2 = dedent("""
+    MATCH (c:Customer)
+    USING INDEX c:Customer(custkey)
+    WHERE c.custkey IS NOT NULL
+    RETURN c.custkey, c.name, c.acctbal
+    ORDER BY c.custkey ASC
+    LIMIT 10
+""")
+
+# E3. Distinct
+QUERY_E3 = dedent("""
+    MATCH (li:LineItem)
+    RETURN DISTINCT li.shipmode
+    ORDER BY li.shipmode
+""")
+
+# Benchmark queries by label, with the parameters they run with
+QUERIES: dict[str, tuple[str, dict[str, Any] | None]] = {
+    "A1. Selection/Projection (Non-Indexed)": (QUERY_A1, {"segment": "BUILDING"}),
+    "A2. Selection/Projection (Non-Indexed Complex)": (QUERY_A2, {"type": "STEEL", "min_size": 25}),
+    "A3. Selection/Projection (Indexed)": (QUERY_A3, {"keys": [1, 10, 100]}),
+    "B1. Aggregation (COUNT)": (QUERY_B1, None),
+    "B2. Aggregation (MAX/MIN/AVG)": (QUERY_B2, None),
+    "C1. Joins (Non-Indexed)": (QUERY_C1, {"segment": "AUTOMOBILE"}),
+    "C2. Joins (Indexed)": (QUERY_C2, {"orderkey": 1}),
+    "C3. Complex Join 1": (QUERY_C3, {"type": "BRASS"}),
+    "C4. Complex Join 2": (QUERY_C4, {"region": "AMERICA"}),
+    "C5. Neighborhood Search": (QUERY_C5, {"custkey": 1}),
+    "C6. Shortest Path": (QUERY_C6, {"suppkey": 1, "custkey": 1}),
+    "C7. Optional Traversal": (QUERY_C7, None),
+    "D3. Set Operations (DIFFERENCE)": (QUERY_D3, None),
+    "E1. Result Modification (Non-Indexed Sorting)": (QUERY_E1, None),
+    "E2. Result Modification (Indexed Sorting)": (QUERY_E2, None),
+    "E3. Result Modification (DISTINCT)": (QUERY_E3, None),
+}
+
+
+def records_data(records: list[Record]) -> list[dict[str, Any]]:
+    return [record.data() for record in records]
+
+
+def format_result(label: str, records: list[dict[str, Any]], summary: bool = False) -> str:
+    """Format a query result as one output line, either in full as JSON or as a row count and the first rows"""
+    if summary:
+        return f"{label}: {len(records)} rows, first {orjson.dumps(records[:3], default=str).decode()}"
+    return f"{label}: {orjson.dumps(records, default=str).decode()}"
+
+
+@dataclass(frozen=True, slots=True)
+class Neo4jConfig:
+    uri: str = "bolt://localhost:7687"
+    user: str = "neo4j"
+    password: str = "password"
+    # Sessions name the database explicitly, so the driver never has to resolve the home database
+    database: str | None = None
+    # Enough connections for every query in main() to run concurrently
+    max_connection_pool_size: int = 50
+    # Fail fast when the pool is exhausted and recycle long-lived connections
+    connection_acquisition_timeout: float = 30
+    max_connection_lifetime: float = 20 * 60
+    fetch_size: int = 1000
+
 
 class Neo4jDB:
-    def __init__(self, config: dict[str, Any] | None = None) -> None:
-        self.config = config or {
-            "uri": "bolt://localhost:7687",
-            "user": "neo4j",
-            "password": "password",
-            # "database": "???"
-        }
+    def __init__(self, config: Neo4jConfig | None = None) -> None:
+        self.config = config or Neo4jConfig()
         self.driver: AsyncDriver | None = None
+        # Idle sessions by access mode and fetch size, reused across queries instead of opening one per query
+        self.sessions: dict[tuple[str, int], list[AsyncSession]] = {}
 
     def connect(self) -> None:
         self.driver = AsyncGraphDatabase.driver(
-            uri=self.config["uri"],
-            auth=(self.config["user"], self.config["password"]),
-            database=self.config["database"] if "database" in self.config else None,
+            uri=self.config.uri,
+            auth=(self.config.user, self.config.password),
+            max_connection_pool_size=self.config.max_connection_pool_size,
+            connection_acquisition_timeout=self.config.connection_acquisition_timeout,
+            max_connection_lifetime=self.config.max_connection_lifetime,
+            # Keep idle connections warm between queries
+            keep_alive=True,
+            fetch_size=self.config.fetch_size,
         )
 
-    async def arun(self, query: str, params: dict[str, Any] | None = None):
-        async with self.driver.session(max_transaction_retry_time=60) as session:
+    @asynccontextmanager
+    async def asession(self, access_mode: str = READ_ACCESS,
+                       fetch_size: int | None = None) -> AsyncIterator[AsyncSession]:
+        """Borrow an idle session, opening a new one when all of them are in use.
+
+        Read sessions can be routed to any cluster member, so queries default to READ_ACCESS and only writes
+        need to ask for WRITE_ACCESS.
+
+        A fetch_size of -1 pulls the whole result at once, which saves a round trip for small results.
+        """
+        if fetch_size is None:
+            fetch_size = self.config.fetch_size
+        idle = self.sessions.setdefault((access_mode, fetch_size), [])
+        if idle:
+            session = idle.pop()
+        else:
+            session = self.driver.session(database=self.config.database, default_access_mode=access_mode,
+                                          fetch_size=fetch_size, max_transaction_retry_time=60)
+        try:
+            yield session
+        except BaseException:
+            # A failed query may leave the session unusable, so it is not reused
+            await session.close()
+            raise
+        idle.append(session)
+
+    async def astream(self, query: str, params: dict[str, Any] | None = None,
+                      fetch_size: int | None = None,
+                      access_mode: str = READ_ACCESS) -> AsyncIterator[dict[str, Any]]:
+        """Yield records as they arrive off the wire instead of buffering the whole result"""
+        async with self.asession(access_mode, fetch_size) as session:
+            result = await session.run(query, params)
+            async for record in result:
+                yield record.data()
+
+    async def arun(self, query: str, params: dict[str, Any] | None = None, fetch_size: int | None = None,
+                   access_mode: str = READ_ACCESS):
+        async with self.asession(access_mode, fetch_size) as session:
+            result = await session.run(query, params)
+            records = [record async for record in result]
+        # Converting records to dicts is plain Python work, so it runs off the event loop
+        return await asyncio.to_thread(records_data, records)
+
+    async def arun_values(self, query: str, params: dict[str, Any] | None = None,
+                          fetch_size: int | None = None,
+                          access_mode: str = READ_ACCESS) -> tuple[tuple[str, ...], list[list[Any]]]:
+        """Run a query and return its column names once plus plain value rows, without a dict per record"""
+        async with self.asession(access_mode, fetch_size) as session:
+            result = await session.run(query, params)
+            keys = result.keys()
+            values = await result.values()
+            return keys, values
+
+    async def arun_df(self, query: str, params: dict[str, Any] | None = None,
+                      fetch_size: int | None = None,
+                      access_mode: str = READ_ACCESS) -> pd.DataFrame:
+        """Run a query and return its result as a DataFrame, stored column by column"""
+        async with self.asession(access_mode, fetch_size) as session:
             result = await session.run(query, params)
-            records = await result.data()
-            return records
+            return await result.to_df()
+
+    async def arun_batch(self, queries: list[tuple[str, dict[str, Any] | None]],
+                         fetch_size: int | None = None,
+                         access_mode: str = READ_ACCESS) -> list[list[dict[str, Any]]]:
+        """Run several queries in one explicit transaction, so begin and commit are paid once for all of them"""
+        async with self.asession(access_mode, fetch_size) as session:
+            async with await session.begin_transaction() as tx:
+                results = []
+                for query, params in queries:
+                    result = await tx.run(query, params)
+                    results.append(await result.data())
+                await tx.commit()
+            return results
+
+    async def awarmup(self, queries: list[tuple[str, dict[str, Any] | None]], fetch_size: int | None = None) -> None:
+        """Plan every query once with EXPLAIN, so the timed runs find their plans in the cache.
+
+        Pass the fetch size the queries will run with, so the warm-up sessions are reused by them.
+        """
+        async def explain(query: str, params: dict[str, Any] | None) -> None:
+            async with self.asession(fetch_size=fetch_size) as session:
+                result = await session.run(f"EXPLAIN {query}", params)
+                await result.consume()
+
+        await asyncio.gather(*(explain(query, params) for query, params in queries))
 
     async def aclose(self) -> None:
+        for idle in self.sessions.values():
+            for session in idle:
+                await session.close()
+        self.sessions.clear()
         if self.driver:
             await self.driver.close()
 
 
+async def run_queries(db: Neo4jDB, queries: dict[str, tuple[str, dict[str, Any] | None]],
+                      workers: int = 4, summary: bool = False) -> list[str]:
+    """Run queries through a bounded submit -> run -> format pipeline, returning their output lines in order"""
+    submit_queue: asyncio.Queue = asyncio.Queue(maxsize=workers)
+    result_queue: asyncio.Queue = asyncio.Queue(maxsize=workers)
+    out = [""] * len(queries)
+
+    async def produce() -> None:
+        for index, (label, (query, params)) in enumerate(queries.items()):
+            await submit_queue.put((index, label, query, params))
+        # One stop marker per worker
+        for _ in range(workers):
+            await submit_queue.put(None)
+
+    async def work() -> None:
+        while (item := await submit_queue.get()) is not None:
+            index, label, query, params = item
+            # None of the queries returns more than a few rows, so each result is pulled in a single round trip
+            records = await db.arun(query, params, fetch_size=-1)
+            await result_queue.put((index, label, records))
+        await result_queue.put(None)
+
+    async def format_results() -> None:
+        running = workers
+        while running:
+            item = await result_queue.get()
+            if item is None:
+                running -= 1
+                continue
+            index, label, records = item
+            out[index] = format_result(label, records, summary)
+
+    # A failing stage cancels the others, so no query is still running once this returns
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(produce())
+            for _ in range(workers):
+                group.create_task(work())
+            group.create_task(format_results())
+    except* Exception as errors:
+        # Report the failing query's own error rather than the group wrapping it
+        raise errors.exceptions[0] from None
+    return out
+
+
 async def main():
+    parser = argparse.ArgumentParser(description="Run the TPC-H benchmark queries against Neo4j")
+    parser.add_argument("--summary", action="store_true",
+                        help="print the row count and first rows of each result instead of the full result")
+    args = parser.parse_args()
+
     db = Neo4jDB()
     db.connect()
 
-    # A. Selection, Projection, Source (of Data)
-    # A1. Non-Indexed Columns
-    query_a1 = """
-        MATCH (c:Customer)
-        WHERE c.mktsegment = 'BUILDING'
-        RETURN c.name, c.address, c.phone
-        LIMIT 10
-    """
-    print("A1. Selection/Projection (Non-Indexed):", await db.arun(query_a1))
-
-    # A2. Non-Indexed Columns with complex condition
-    query_a2 = """
-        MATCH (p:Part)
-        WHERE p.type CONTAINS 'STEEL' AND p.size > 25
-        RETURN p.name, p.type, p.size, p.retailprice
-        LIMIT 10
-    """
-    print("A2. Selection/Projection (Non-Indexed Complex):", await db.arun(query_a2))
-
-    # A3. Indexed Columns
-    query_a3 = """
-        MATCH (s:Supplier)
-        WHERE s.suppkey IN [1, 10, 100]
-        RETURN s.suppkey, s.name, s.address
-    """
-    print("A3. Selection/Projection (Indexed):", await db.arun(query_a3))
-
-    # B. Aggregation
-    # B1. COUNT
-    query_b1 = """
-        MATCH (c:Customer)-[:LOCATED_IN]->(n:Nation)
-        RETURN n.name as nation, COUNT(c) as customer_count
-        ORDER BY customer_count DESC
-        LIMIT 5
-    """
-    print("B1. Aggregation (COUNT):", await db.arun(query_b1))
-
-    # B2. MAX
-    query_b2 = """
-        MATCH (o:Order)
-        RETURN MAX(o.totalprice) as max_order_value,
-               MIN(o.totalprice) as min_order_value,
-               AVG(o.totalprice) as avg_order_value
-    """
-    print("B2. Aggregation (MAX/MIN/AVG):", await db.arun(query_b2))
-
-    # C. Joins
-    # C1. Non-Indexed Columns Join
-    query_c1 = """
-        MATCH (c:Customer)-[:LOCATED_IN]->(n:Nation)
-        WHERE c.mktsegment = 'AUTOMOBILE'
-        RETURN c.name, n.name as nation
-        LIMIT 10
-    """
-    print("C1. Joins (Non-Indexed):", await db.arun(query_c1))
-
-    # C2. Indexed Columns Join
-    query_c2 = """
-        MATCH (o:Order)<-[:PLACED]-(c:Customer)
-        WHERE o.orderkey = 1
-        RETURN o.orderkey, o.totalprice, c.name, c.custkey
-    """
-    print("C2. Joins (Indexed):", await db.arun(query_c2))
-
-    # C3. Complex Join 1
-    query_c3 = """
-        MATCH (c:Customer)-[:PLACED]->(o:Order)-[:CONTAINS]->(li:LineItem)-[:OF_PART]->(p:Part)
-        WHERE p.type CONTAINS 'BRASS'
-        RETURN c.name, o.orderkey, p.name, li.quantity, li.extendedprice
-        LIMIT 10
-    """
-    print("C3. Complex Join 1:", await db.arun(query_c3))
-
-    # C4. Complex Join 2
-    query_c4 = """
-        MATCH (s:Supplier)-[:LOCATED_IN]->(n:Nation)-[:BELONGS_TO]->(r:Region)
-        MATCH (s)-[:SUPPLIES]->(p:Part)
-        WHERE r.name = 'AMERICA'
-        RETURN s.name, n.name, p.name, p.retailprice
-        LIMIT 10
-    """
-    print("C4. Complex Join 2:", await db.arun(query_c4))
-
-    # C5. Neighborhood Search
-    query_c5 = """
-        MATCH (c:Customer {custkey: 1})-[:PLACED]->(o:Order)-[:CONTAINS]->(li:LineItem)
-        RETURN c.name, COUNT(o) as order_count, SUM(li.extendedprice) as total_spent
-    """
-    print("C5. Neighborhood Search:", await db.arun(query_c5))
-
-    # C6. Shortest Path
-    query_c6 = """
-        MATCH path = shortestPath((s:Supplier)-[*]-(c:Customer))
-        WHERE s.suppkey = 1 AND c.custkey = 1
-        RETURN length(path) as path_length, nodes(path)
-        LIMIT 1
-    """
-    print("C6. Shortest Path:", await db.arun(query_c6))
-
-    # C7. Optional Traversal
-    query_c7 = """
-        MATCH (c:Customer)
-        OPTIONAL MATCH (c)-[:PLACED]->(o:Order)
-        RETURN c.name, COUNT(o) as order_count
-        ORDER BY order_count DESC
-        LIMIT 10
-    """
-    print("C7. Optional Traversal:", await db.arun(query_c7))
-
-    # D. Set Operations
-    # D1. Union
-    # query_d1 = """
-    #     MATCH (n:Nation)-[:BELONGS_TO]->(r:Region {name: 'AMERICA'})
-    #     RETURN n.name as nation, 'AMERICA' as region
-    #     UNION
-    #     MATCH (n:Nation)-[:BELONGS_TO]->(r:Region {name: 'EUROPE'})
-    #     RETURN n.name as nation, 'EUROPE' as region
-    #     ORDER BY nation
-    #     LIMIT 10
-    # """
-    # print("D1. Set Operations (UNION):", await db.arun(query_d1))
-
-    # D2. Intersection
-    # query_d2 = """
-    #     MATCH (c1:Customer)-[:PLACED]->(o1:Order)-[:CONTAINS]->(li1:LineItem)-[:OF_PART]->(p:Part)
-    #     MATCH (c2:Customer)-[:PLACED]->(o2:Order)-[:CONTAINS]->(li2:LineItem)-[:OF_PART]->(p)
-    #     WHERE c1.custkey < c2.custkey
-    #     RETURN p.name, COUNT(DISTINCT c1) + COUNT(DISTINCT c2) as shared_customers
-    #     LIMIT 5
-    # """
-    # print("D2. Set Operations (INTERSECTION):", await db.arun(query_d2))
-
-    # D3. Difference
-    query_d3 = """
-        MATCH (c:Customer)
-        WHERE NOT EXISTS((c)-[:PLACED]->(:Order))
-        RETURN c.name, c.custkey
-        LIMIT 10
-    """
-    print("D3. Set Operations (DIFFERENCE):", await db.arun(query_d3))
-
-    # E. Result Modification
-    # E1. Non-Indexed Columns Sorting
-    query_e1 = """
-        MATCH (p:Part)
-        RETURN p.name, p.retailprice
-        ORDER BY p.retailprice DESC
-        LIMIT 10
-    """
-    print("E1. Result Modification (Non-Indexed Sorting):", await db.arun(query_e1))
-
-    # E2. Indexed Columns Sorting
-    query_e2 = """
-        MATCH (c:Customer)
-        RETURN c.custkey, c.name, c.acctbal
-        ORDER BY c.custkey ASC
-        LIMIT 10
-    """
-    print("E2. Result Modification (Indexed Sorting):", await db.arun(query_e2))
-
-    # E3. Distinct
-    query_e3 = """
-        MATCH (li:LineItem)
-        RETURN DISTINCT li.shipmode
-        ORDER BY li.shipmode
-    """
-    print("E3. Result Modification (DISTINCT):", await db.arun(query_e3))
-
-    await db.aclose()
+    # The queries are independent, so several run at once while earlier results are being formatted
+    try:
+        # run_queries pulls every result in one go, so warm up sessions with the same fetch size
+        await db.awarmup(list(QUERIES.values()), fetch_size=-1)
+        out = await run_queries(db, QUERIES, summary=args.summary)
+    finally:
+        await db.aclose()
+
+    # Write all results at once instead of flushing stdout once per query
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":